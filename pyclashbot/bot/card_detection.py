@@ -6185,7 +6185,7 @@ play_side = "left"
 
 def check_which_cards_are_available(emulator, check_champion=False, check_side=False):
     global battle_iar
-    battle_iar = emulator.screenshot()
+    battle_iar = emulator.screenshot_raw()
     card_exists_list = []
 
     if check_champion and (
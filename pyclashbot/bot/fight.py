@@ -268,7 +268,7 @@ def wait_for_elixer(
 
 def count_elixer(emulator, elixer_count) -> bool:
     """Method to check for 4 elixer during a battle"""
-    iar = emulator.screenshot()
+    iar = emulator.screenshot_raw()
 
     if pixel_is_equal(
         iar[ELIXIR_COORDS[elixer_count - 1][0], ELIXIR_COORDS[elixer_count - 1][1]],
@@ -201,7 +201,8 @@ class WorkerProcess(Process):
             if emulator is None:
                 return
 
-            self._run_bot_loop(emulator, self.jobs, logger)
+            with emulator:
+                self._run_bot_loop(emulator, self.jobs, logger)
         except Exception as err:
             logger.error(str(err))
             traceback.print_exc()
@@ -35,7 +35,7 @@ class AdbController(AdbBasedController):
         """
         self.logger = logger
         self.device_serial = device_serial
-        self._auto_stop_on_del = False  # No process to stop
+        self._auto_stop_on_exit = False  # No process to stop
 
         # For storing original screen settings
         self.original_size = None
@@ -208,15 +208,18 @@ class AdbController(AdbBasedController):
         state = self.adb("get-state").stdout.strip()
         return state == "device"
 
+    def _adb_command(self, command: str, use_serial: bool = True) -> str:
+        """Builds the adb command line, targeting the specified device unless use_serial is False."""
+        if use_serial and self.device_serial:
+            return f"adb -s {self.device_serial} {command}"
+        return f"adb {command}"
+
     def adb(self, command: str, binary_output: bool = False, use_serial: bool = True) -> subprocess.CompletedProcess:
         """
         Runs an ADB command targeting the specified device.
         This is the abstract method implementation for AdbBasedController.
         """
-        if use_serial and self.device_serial:
-            full_command = f"adb -s {self.device_serial} {command}"
-        else:
-            full_command = f"adb {command}"
+        full_command = self._adb_command(command, use_serial)
 
         if DEBUG:
             print(f"[Android/ADB] {full_command}")
@@ -234,8 +237,7 @@ class AdbController(AdbBasedController):
         Check if an app is installed using system ADB.
         This is the abstract method implementation for AdbBasedController.
         """
-        result = self.adb("shell pm list packages")
-        return result.stdout is not None and package_name in result.stdout
+        return self._check_app_installed_via_data_dir(package_name)
 
     @staticmethod
     def restart_adb(logger):
@@ -335,6 +337,7 @@ class AdbController(AdbBasedController):
         Restores the original screen properties when the bot stops.
         """
         self.logger.log("Stop method called. Restoring original screen properties.")
+        self._close_adb_shell()
         self.restore_original_screen_props()
         pass
 
@@ -352,6 +355,7 @@ class AdbController(AdbBasedController):
         """
         start_ts = time.time()
         self.logger.change_status("Restarting Clash Royale on device...")
+        self._close_adb_shell()
 
         clash_pkg = "com.supercell.clashroyale"
 
@@ -391,5 +395,5 @@ class AdbController(AdbBasedController):
     # swipe() is now inherited from AdbBasedController
     # screenshot() is now inherited from AdbBasedController
     # start_app() is now inherited from AdbBasedController
-    # _wait_for_clash_installation() is now inherited from AdbBasedController
-    # _retry_installation_check() is now inherited from AdbBasedController
+    # _wait_for_clash_installation() is now inherited from BaseEmulatorController
+    # _retry_installation_check() is now inherited from BaseEmulatorController
@@ -1,11 +1,37 @@
+import queue
 import subprocess
+import threading
 from abc import ABC, abstractmethod
+from contextlib import suppress
 
 import cv2
 import numpy as np
 
-from pyclashbot.emulators.base import BaseEmulatorController
+from pyclashbot.emulators.base import BaseEmulatorController, ScreenshotChannels
 from pyclashbot.utils.cancellation import interruptible_sleep
+from pyclashbot.utils.image_handler import convert_screenshot
+
+# Printed after each command in the persistent shell session to delimit its output
+_SHELL_END_MARKER = "__PYCLASHBOT_SHELL_END__"
+
+# Prints _SHELL_END_MARKER, quoted so a terminal echoing the command line back never matches it
+_SHELL_END_COMMAND = "echo __PYCLASHBOT_SHELL_''END__"
+
+# Seconds without output before the shell session is treated as wedged
+_SHELL_READ_TIMEOUT = 10.0
+
+# Android PixelFormat values for 32-bit framebuffers that screencap can emit
+_RAW_RGBA_FORMATS = {1, 2}  # RGBA_8888, RGBX_8888
+
+_RGBA_CONVERSIONS = {
+    "bgr": cv2.COLOR_RGBA2BGR,
+    "rgb": cv2.COLOR_RGBA2RGB,
+    "gray": cv2.COLOR_RGBA2GRAY,
+}
+
+# Longest total pause click_sequence will hand to the device, since a device-side
+# sleep holds the shell session and cannot be interrupted by a stop request
+_MAX_BATCHED_DELAY = 1.0
 
 
 class AdbBasedController(BaseEmulatorController, ABC):
@@ -13,14 +39,30 @@ class AdbBasedController(BaseEmulatorController, ABC):
     Abstract base class for emulator controllers that use ADB.
 
     This class provides concrete implementations for common ADB operations
-    (click, swipe, screenshot, start_app, installation waiting)
+    (click, swipe, screenshot, start_app)
     by leveraging an abstract `adb` method that subclasses must implement.
 
     Subclasses must implement:
     - adb(command, binary_output) -> subprocess.CompletedProcess
     - _check_app_installed(package_name) -> bool
+
+    Subclasses should also implement _adb_command(command) so shell commands
+    can share one persistent 'adb shell' session instead of spawning adb each time.
     """
 
+    # Environment for adb subprocesses, None inherits the bot's environment
+    adb_env: dict[str, str] | None = None
+
+    _shell: subprocess.Popen | None = None
+    _shell_output: queue.Queue | None = None
+
+    # Whether the device supports shell_v2, None until asked. Older devices always run
+    # 'adb shell' on a terminal that echoes input, so they don't get a persistent session.
+    _shell_v2: bool | None = None
+
+    # Set once the device refuses to stat /data/data, so later checks go straight to pm path
+    _data_dir_probe_denied: bool = False
+
     # === Abstract methods (must be implemented by subclasses) ===
 
     @abstractmethod
@@ -46,6 +88,11 @@ class AdbBasedController(BaseEmulatorController, ABC):
         """
         Check if an app is installed using the emulator's specific ADB mechanism.
 
+        Implementations should probe the single package, via
+        _check_app_installed_via_data_dir or _check_app_installed_via_pm_path,
+        rather than grepping the output of `pm list packages`, which
+        enumerates every installed package.
+
         Args:
             package_name (str): The package name to check (e.g., "com.supercell.clashroyale").
 
@@ -54,25 +101,76 @@ class AdbBasedController(BaseEmulatorController, ABC):
         """
         raise NotImplementedError
 
+    def _adb_command(self, command: str) -> str | None:
+        """
+        Build the host command line that runs `adb <command>` against this
+        controller's device, as adb() would.
+
+        Returns:
+            str | None: The command line, or None if the controller doesn't
+                        support a persistent shell session.
+        """
+        return None
+
     # === Concrete shared methods (inherited by all subclasses) ===
 
+    def __exit__(self, *exc_info):
+        try:
+            super().__exit__(*exc_info)
+        finally:
+            self._close_adb_shell()
+
     def click(self, x_coord: int, y_coord: int, clicks: int = 1, interval: float = 0.0):
-        """Click on the screen using ADB input tap."""
-        for _ in range(max(1, clicks)):
-            self.adb(f"shell input tap {x_coord} {y_coord}")
-            if clicks > 1:
-                interruptible_sleep(max(0.0, interval))
+        """Click on the screen using ADB input tap, batching repeated clicks into one command."""
+        if clicks <= 1:
+            self._adb_shell(f"input tap {x_coord} {y_coord}")
+            return
+        self.click_sequence([(x_coord, y_coord, interval)] * clicks)
+
+    def click_sequence(self, points: list[tuple[int, int, float]]):
+        """
+        Click a series of points with a single shell command.
+
+        The taps and the pauses between them run as one device-side script,
+        so a macro costs one ADB round-trip instead of one per tap. The pause
+        after the final tap is waited out locally. Sequences whose pauses add
+        up to more than _MAX_BATCHED_DELAY are clicked one tap at a time so a
+        stop request can interrupt them.
+
+        Args:
+            points (list[tuple[int, int, float]]): (x_coord, y_coord, delay) for
+                each click, where delay is the pause in seconds after it.
+        """
+        if not points:
+            return
+
+        if sum(max(0.0, delay) for _, _, delay in points[:-1]) > _MAX_BATCHED_DELAY:
+            super().click_sequence(points)
+            return
+
+        steps: list[str] = []
+        for i, (x_coord, y_coord, delay) in enumerate(points):
+            steps.append(f"input tap {x_coord} {y_coord}")
+            if i < len(points) - 1 and delay > 0:
+                steps.append(f"sleep {delay:.3f}")
+        self._adb_shell("; ".join(steps))
+
+        interruptible_sleep(max(0.0, points[-1][2]))
 
     def swipe(self, x_coord1: int, y_coord1: int, x_coord2: int, y_coord2: int):
         """Swipe on the screen using ADB input swipe."""
-        self.adb(f"shell input swipe {x_coord1} {y_coord1} {x_coord2} {y_coord2}")
+        self._adb_shell(f"input swipe {x_coord1} {y_coord1} {x_coord2} {y_coord2}")
 
-    def screenshot(self) -> np.ndarray:
+    def screenshot(self, out: np.ndarray | None = None, *, channels: ScreenshotChannels = "bgr") -> np.ndarray:
         """
         Capture a screenshot using ADB 'exec-out screencap -p'.
 
+        Args:
+            out (np.ndarray, optional): Caller-owned buffer to write the frame into.
+            channels (str): Layout of the returned image: "bgr", "rgb" or "gray".
+
         Returns:
-            np.ndarray: The screenshot as a CV2 (BGR) image.
+            np.ndarray: The screenshot, as a CV2 (BGR) image by default.
 
         Raises:
             RuntimeError: If the ADB screencap command fails.
@@ -85,12 +183,58 @@ class AdbBasedController(BaseEmulatorController, ABC):
             raise RuntimeError(f"ADB screencap failed: {err.decode('utf-8', 'ignore')}")
 
         img_array = np.frombuffer(result.stdout, dtype=np.uint8)
-        img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+        # Decode grayscale requests directly instead of writing a BGR frame and converting it
+        flags = cv2.IMREAD_GRAYSCALE if channels == "gray" else cv2.IMREAD_COLOR
+        img = cv2.imdecode(img_array, flags)
 
         if img is None:
             raise ValueError("Failed to decode screenshot. Image data may be corrupt or empty.")
 
-        return img
+        return convert_screenshot(img, out, channels)
+
+    def screenshot_raw(self, out: np.ndarray | None = None, *, channels: ScreenshotChannels = "bgr") -> np.ndarray:
+        """
+        Capture a screenshot using ADB 'exec-out screencap' without PNG encoding.
+
+        screencap writes a little-endian header (width, height, pixel format and,
+        on Android 9+, a colour space) followed by the RGBA framebuffer. The pixel
+        data is viewed in place and converted once into the requested layout.
+        Falls back to screenshot() if the framebuffer is not 32-bit RGBA.
+
+        Args:
+            out (np.ndarray, optional): Caller-owned buffer to write the frame into.
+            channels (str): Layout of the returned image: "bgr", "rgb" or "gray".
+
+        Returns:
+            np.ndarray: The screenshot, as a CV2 (BGR) image by default.
+
+        Raises:
+            RuntimeError: If the ADB screencap command fails.
+            ValueError: If the captured framebuffer is truncated or malformed.
+        """
+        result = self.adb("exec-out screencap", binary_output=True)
+
+        data = result.stdout
+        if result.returncode != 0 or not data or len(data) < 12:
+            err = result.stderr if result.stderr else b"Unknown ADB error"
+            raise RuntimeError(f"ADB screencap failed: {err.decode('utf-8', 'ignore')}")
+
+        width, height, pixel_format = np.frombuffer(data, dtype="<u4", count=3)
+        if pixel_format not in _RAW_RGBA_FORMATS:
+            return self.screenshot(out, channels=channels)
+
+        header_size = len(data) - int(width) * int(height) * 4
+        if header_size not in {12, 16}:
+            raise ValueError("Failed to read screenshot. Framebuffer size does not match its header.")
+
+        rgba = np.frombuffer(data, dtype=np.uint8, offset=header_size).reshape(height, width, 4)
+        return cv2.cvtColor(rgba, _RGBA_CONVERSIONS[channels], dst=out)
+
+    def install_apk(self, apk_path: str):
+        """Install an APK using ADB install, replacing any existing version."""
+        result = self.adb(f'install -r "{apk_path}"')
+        self._invalidate_package_cache()
+        return result.returncode == 0
 
     def start_app(self, package_name: str):
         """
@@ -106,54 +250,176 @@ class AdbBasedController(BaseEmulatorController, ABC):
             True if the app was started or if the installation
             wait was successfully initiated and completed.
         """
-        if not self._check_app_installed(package_name):
+        if not self._is_install_confirmed(package_name):
             # App not found, trigger the user installation prompt
             return self._wait_for_clash_installation(package_name)
 
         # App is installed, launch it
-        self.adb(f"shell monkey -p {package_name} -c android.intent.category.LAUNCHER 1")
+        result = self.adb(f"shell monkey -p {package_name} -c android.intent.category.LAUNCHER 1")
+        if "No activities found" in f"{result.stdout or ''}{result.stderr or ''}":
+            # A stale install marker or cache entry, the app is gone after all
+            self.logger.log(f"[!] Could not launch {package_name}, checking installation again")
+            self._invalidate_package_cache(package_name)
+            return self._wait_for_clash_installation(package_name)
         return True
 
-    def _wait_for_clash_installation(self, package_name: str):
+    def _check_app_installed_via_data_dir(self, package_name: str) -> bool:
         """
-        Private method to show a UI prompt and wait for the user to install
-        the specified app.
-        """
-        self.current_package_name = package_name
-        self.logger.show_temporary_action(
-            message=f"{package_name} not installed - please install it and complete tutorial",
-            action_text="Retry",
-            callback=self._retry_installation_check,
-        )
+        Check if an app is installed by looking for its /data/data/<package>
+        directory, a single stat on the device instead of a package manager call.
 
-        self.logger.log(f"[!] {package_name} not installed.")
-        self.installation_waiting = True
+        Rooted and userdebug emulator images allow this. When the shell user is
+        denied access, falls back to _check_app_installed_via_pm_path for this
+        and every later check. Any other unexpected output (e.g. the device
+        going offline) falls back for this check only.
 
-        while self.installation_waiting:
-            interruptible_sleep(0.5)
+        Args:
+            package_name (str): The package name to check.
 
-        # This loop breaks when _retry_installation_check sets
-        # self.installation_waiting = False
-        self.logger.log("[+] Installation confirmed, continuing...")
-        return True
+        Returns:
+            bool: True if the app is installed, False otherwise.
+        """
+        if not self._data_dir_probe_denied:
+            output = self._adb_shell(f"ls -d /data/data/{package_name} 2>&1 >/dev/null && echo OK").strip()
+            if output == "OK":
+                return True
+            if "No such file" in output:
+                return False
+            if "Permission denied" in output:
+                self._data_dir_probe_denied = True
+        return self._check_app_installed_via_pm_path(package_name)
+
+    def _check_app_installed_via_pm_path(self, package_name: str) -> bool:
+        """
+        Check if an app is installed using `pm path`, which only resolves the
+        given package instead of listing all of them.
+
+        Args:
+            package_name (str): The package name to check.
 
-    def _retry_installation_check(self):
+        Returns:
+            bool: True if the package manager reports an APK path for the package.
         """
-        Callback method for the 'Retry' button. Checks if the app
-        has been installed.
+        return "package:" in self._adb_shell(f"pm path {package_name}")
+
+    def _adb_shell(self, command: str) -> str:
         """
-        self.logger.change_status("Checking for app installation...")
+        Run a command on the device through a persistent 'adb shell' session.
 
-        package_name = getattr(self, "current_package_name", "com.supercell.clashroyale")
+        The session is started on first use and reused, so each command costs
+        a pipe write instead of a new adb process and handshake. If writing to
+        a dead session fails (e.g. after an adb server restart), the session is
+        restarted once. A session that closes or stops answering after the
+        command was sent is closed and the command is not resent, so taps are
+        never sent twice. Only when no session can be started or written to is
+        the command run through adb() instead.
+
+        Args:
+            command (str): The device shell command (e.g., "input tap 1 2").
 
-        if self._check_app_installed(package_name):
-            self.installation_waiting = False
-            self.logger.change_status("Installation complete - continuing...")
-        else:
-            # App still not found, show the prompt again
-            self.logger.show_temporary_action(
-                message=f"{package_name} still not found - please install it and complete tutorial",
-                action_text="Retry",
-                callback=self._retry_installation_check,
+        Returns:
+            str: The command's combined stdout and stderr.
+        """
+        with self.__dict__.setdefault("_shell_lock", threading.Lock()):
+            for _ in range(2):
+                shell = self._ensure_adb_shell()
+                if shell is None:
+                    break
+                try:
+                    # Bytes rather than text mode so Windows doesn't send "\r\n" to the device shell
+                    shell.stdin.write(f"{command}\n{_SHELL_END_COMMAND}\n".encode())
+                    shell.stdin.flush()
+                except OSError:
+                    # Nothing reached the device, so the command is safe to resend
+                    self._close_adb_shell()
+                    continue
+                try:
+                    return self._read_adb_shell_output()
+                except EOFError as error:
+                    self._close_adb_shell()
+                    return error.args[0] if error.args else ""
+                except TimeoutError:
+                    # The command may already have run, so give up on it rather than resend it
+                    self._close_adb_shell()
+                    return ""
+
+        result = self.adb(f'shell "{command}"')
+        return result.stdout or ""
+
+    def _ensure_adb_shell(self) -> subprocess.Popen | None:
+        """Return the running shell session, starting one if needed."""
+        if self._shell is not None and self._shell.poll() is None:
+            return self._shell
+        self._close_adb_shell()
+
+        command_line = self._adb_command("shell")
+        if command_line is None:
+            return None
+        if self._shell_v2 is None:
+            result = self.adb("features")
+            if result.returncode != 0:
+                # Device not reachable right now, ask again next time
+                return None
+            self._shell_v2 = "shell_v2" in (result.stdout or "")
+        if not self._shell_v2:
+            return None
+        try:
+            shell = subprocess.Popen(
+                command_line,
+                shell=True,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=self.adb_env,
             )
-            self.logger.log(f"[!] {package_name} still not installed. Please try again.")
+        except OSError:
+            return None
+
+        # Pipes can't be read with a timeout on Windows, so a thread reads them into a queue
+        self._shell_output = queue.Queue()
+        threading.Thread(target=_pump_lines, args=(shell.stdout, self._shell_output), daemon=True).start()
+        self._shell = shell
+        return shell
+
+    def _read_adb_shell_output(self) -> str:
+        """
+        Read the shell session's output up to the end marker.
+
+        Raises:
+            TimeoutError: If the session is silent for _SHELL_READ_TIMEOUT seconds.
+            EOFError: If the session closes first, with the output read so far as its argument.
+        """
+        output: list[str] = []
+        while True:
+            try:
+                line = self._shell_output.get(timeout=_SHELL_READ_TIMEOUT)
+            except queue.Empty:
+                raise TimeoutError("adb shell session stopped responding") from None
+            if line is None:
+                raise EOFError("".join(output))
+            text = line.decode("utf-8", "ignore").replace("\r", "")
+            marker = text.find(_SHELL_END_MARKER)
+            if marker != -1:
+                output.append(text[:marker])
+                return "".join(output)
+            output.append(text)
+
+    def _close_adb_shell(self):
+        """Close the persistent shell session, if one is open."""
+        shell = self._shell
+        self._shell = None
+        if shell is None:
+            return
+        with suppress(OSError):
+            shell.stdin.close()
+        try:
+            shell.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            shell.kill()
+
+
+def _pump_lines(stream, lines: queue.Queue):
+    """Copy lines from a pipe into a queue, then put None once the pipe closes."""
+    for line in iter(stream.readline, b""):
+        lines.put(line)
+    lines.put(None)
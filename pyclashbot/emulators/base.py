@@ -1,69 +1,121 @@
-import numpy as np
+import os
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from typing import TYPE_CHECKING, Literal
 
-from pyclashbot.utils.platform import CURRENT_PLATFORM, Platform
+from pyclashbot.utils.cancellation import CancellationToken, interruptible_sleep
+from pyclashbot.utils.platform import CURRENT_PLATFORM, Platform, get_app_data_dir
 
+if TYPE_CHECKING:
+    import numpy as np
 
-class BaseEmulatorController:
+ScreenshotChannels = Literal["rgb", "bgr", "gray"]
+
+# Marker files recording apps confirmed installed, so later runs can skip the check
+INSTALL_MARKER_DIR = os.path.join(get_app_data_dir("py-clash-bot"), "install_markers")
+
+
+class BaseEmulatorController(ABC):
     """
     Base class for emulator controllers.
     This class is used to define the interface for all emulator controllers.
+    Subclasses that leave an abstract method unimplemented cannot be instantiated.
     """
 
     supported_platforms: list[Platform] = []
 
+    # Whether leaving a "with" block stops the emulator, controllers may set this to False
+    _auto_stop_on_exit: bool = True
+
+    # Seconds a positive _check_app_installed result is reused
+    _PKG_CACHE_TTL = 5.0
+
+    # Seconds an install marker is trusted before the emulator is asked again
+    _INSTALL_MARKER_MAX_AGE = 7 * 24 * 60 * 60
+
     @classmethod
     def is_supported_on_current_platform(cls) -> bool:
         """Check if this emulator is supported on the current platform."""
         return CURRENT_PLATFORM in cls.supported_platforms
 
-    def __init__(self):
-        raise NotImplementedError
+    def __enter__(self):
+        # Controllers boot the emulator in __init__, so there is nothing to start here.
+        return self
 
-    def __del__(self):
-        # Avoid raising in destructor, subclasses may optionally implement cleanup.
-        # Allow controllers to opt out by setting "_auto_stop_on_del = False".
+    def __exit__(self, *exc_info):
+        # Stop the emulator when leaving a "with" block. stop() must be safe to call more than once.
+        self._cancel_installation_wait()
+        if not self._auto_stop_on_exit:
+            return
         try:
-            if getattr(self, "_auto_stop_on_del", True):  # type: ignore[attr-defined]
-                self.stop()  # type: ignore[attr-defined]
-        except Exception:
-            pass
+            self.stop()
+        except (OSError, subprocess.SubprocessError) as err:
+            # An emulator that is already gone shouldn't mask an exception from the "with" body
+            self.logger.log(f"[!] Non fatal error: Failed to stop the emulator: {err}")
 
     def create(self):
         """
         This method is used to create the emulator.
+
+        Controllers that attach to an existing emulator keep this default, which only logs.
         """
-        raise NotImplementedError
+        self.logger.log(f"{type(self).__name__} does not create its emulator, skipping")
 
     def configure(self):
         """
         This method is used to configure the emulator.
+
+        Controllers that attach to an existing emulator keep this default, which only logs.
         """
-        raise NotImplementedError
+        self.logger.log(f"{type(self).__name__} does not configure its emulator, skipping")
 
+    @abstractmethod
     def restart(self):
         """
         This method is used to restart the emulator.
         """
         raise NotImplementedError
 
+    @abstractmethod
     def start(self):
         """
         This method is used to start the emulator.
         """
         raise NotImplementedError
 
+    @abstractmethod
     def stop(self):
         """
         This method is used to stop the emulator.
         """
         raise NotImplementedError
 
+    @abstractmethod
     def click(self, x_coord: int, y_coord: int, clicks: int, interval: float):
         """
         This method is used to click on the emulator screen.
+
+        Implementations should send repeated clicks (clicks > 1) in a single
+        round-trip to the emulator where possible.
         """
         raise NotImplementedError
 
+    def click_sequence(self, points: list[tuple[int, int, float]]):
+        """
+        This method is used to click a series of points on the emulator screen.
+
+        Each point is (x_coord, y_coord, delay), where delay is the pause in
+        seconds after that click. Controllers that can batch taps into one
+        command should override this; the default clicks each point in turn.
+        """
+        for x_coord, y_coord, delay in points:
+            self.click(x_coord, y_coord, 1, 0.0)
+            interruptible_sleep(max(0.0, delay))
+
+    @abstractmethod
     def swipe(
         self,
         x_coord1: int,
@@ -76,20 +128,290 @@ class BaseEmulatorController:
         """
         raise NotImplementedError
 
-    def screenshot(self) -> np.ndarray:
+    @abstractmethod
+    def screenshot(self, out: "np.ndarray | None" = None, *, channels: ScreenshotChannels = "bgr") -> "np.ndarray":
         """
         This method is used to take a screenshot of the emulator screen.
+
+        If out is given the frame is written into it and out is returned, so
+        callers in a tight loop can reuse one buffer instead of allocating a
+        new frame each call. channels selects the returned layout: "bgr"
+        (H x W x 3, the default), "rgb" (H x W x 3) or "gray" (H x W).
         """
         raise NotImplementedError
 
+    def screenshot_raw(self, out: "np.ndarray | None" = None, *, channels: ScreenshotChannels = "bgr") -> "np.ndarray":
+        """
+        This method is used to take a screenshot from the emulator's uncompressed
+        framebuffer, skipping the PNG encode and decode done by screenshot().
+
+        It takes the same arguments and returns the same layout as screenshot(),
+        so hot loops can call it instead. Controllers without a raw capture path
+        fall back to screenshot().
+        """
+        return self.screenshot(out, channels=channels)
+
+    @abstractmethod
     def install_apk(self, apk_path: str):
         """
         This method is used to install an APK on the emulator.
         """
         raise NotImplementedError
 
+    @abstractmethod
     def start_app(self, package_name: str):
         """
         This method is used to start an app on the emulator.
         """
         raise NotImplementedError
+
+    @abstractmethod
+    def _check_app_installed(self, package_name: str) -> bool:
+        """
+        This method is used to check if an app is installed on the emulator.
+        """
+        raise NotImplementedError
+
+    def _wait_for_clash_installation(self, package_name: str, timeout: float | None = None):
+        """
+        Private method to show a UI prompt and wait for the user to install
+        the specified app.
+
+        Returns False instead of waiting forever if the timeout (in seconds)
+        expires, the bot is stopped, or _cancel_installation_wait is called.
+        """
+        install_cond = self._get_install_condition()
+        with install_cond:
+            self.installation_waiting = True
+            self._install_wait_cancelled = False
+        self._prompt_for_installation(package_name)
+
+        token = CancellationToken.current()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with install_cond:
+            while self.installation_waiting and not self._install_wait_cancelled:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                # The stop request arrives on a process-wide event that can't notify
+                # this condition, so under a cancellation token wake once a second to check it.
+                if token is not None:
+                    if token.is_cancelled():
+                        break
+                    remaining = 1.0 if remaining is None else min(remaining, 1.0)
+                install_cond.wait(timeout=remaining)
+
+            installed = not self.installation_waiting
+            self.installation_waiting = False
+
+        if not installed:
+            self.logger.log(f"[!] Stopped waiting for {package_name} to be installed.")
+            return False
+
+        self._write_install_marker(package_name)
+        self.logger.log("[+] Installation confirmed, continuing...")
+        return True
+
+    def _cancel_installation_wait(self):
+        """Make a pending _wait_for_clash_installation return False, e.g. during shutdown."""
+        install_cond = self._get_install_condition()
+        with install_cond:
+            self._install_wait_cancelled = True
+            install_cond.notify_all()
+
+        self._install_aio_cancelled = True
+        self._wake_install_aio_wait()
+
+    def _get_install_condition(self) -> threading.Condition:
+        """Return the condition guarding installation_waiting, creating it on first use."""
+        return self.__dict__.setdefault("_install_cond", threading.Condition())
+
+    async def _await_clash_installation(self, package_name: str) -> bool:
+        """
+        Coroutine version of _wait_for_clash_installation, so one event loop
+        can wait on several pending installs without parking a thread each.
+
+        Returns False if the bot is stopped or _cancel_installation_wait is
+        called. Cancel the awaiting task to abandon the wait.
+        """
+        import asyncio  # noqa: PLC0415 - only this coroutine needs it, keep it off the startup path
+
+        install_event = asyncio.Event()
+        self._install_aio_loop = asyncio.get_running_loop()
+        self._install_aio_event = install_event
+        self._install_aio_cancelled = False
+        self._prompt_for_installation(package_name)
+
+        token = CancellationToken.current()
+        try:
+            while not install_event.is_set():
+                if token is not None and token.is_cancelled():
+                    break
+                # Same as the threaded wait, poll the process-wide stop request once a second
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(install_event.wait(), timeout=None if token is None else 1.0)
+        finally:
+            self._install_aio_event = None
+
+        if not install_event.is_set() or self._install_aio_cancelled:
+            self.logger.log(f"[!] Stopped waiting for {package_name} to be installed.")
+            return False
+
+        self._write_install_marker(package_name)
+        self.logger.log("[+] Installation confirmed, continuing...")
+        return True
+
+    def _prompt_for_installation(self, package_name: str):
+        """Show the Retry prompt asking the user to install the specified app."""
+        self.current_package_name = package_name
+        self.logger.show_temporary_action(
+            message=f"{package_name} not installed - please install it and complete tutorial",
+            action_text="Retry",
+            callback=self._retry_installation_check,
+        )
+
+        self.logger.log(f"[!] {package_name} not installed.")
+        self.logger.log("Please install it in the emulator, complete tutorial, then click Retry in the GUI")
+
+    def _signal_installation_complete(self):
+        """Wake whichever installation wait, threaded or asyncio, is pending."""
+        install_cond = self._get_install_condition()
+        with install_cond:
+            self.installation_waiting = False
+            install_cond.notify_all()
+
+        self._wake_install_aio_wait()
+
+    def _wake_install_aio_wait(self):
+        """Wake a pending _await_clash_installation from any thread."""
+        # asyncio.Event is not thread safe, and the Retry callback runs on the GUI thread
+        aio_event = getattr(self, "_install_aio_event", None)
+        aio_loop = getattr(self, "_install_aio_loop", None)
+        if aio_event is not None and aio_loop is not None and not aio_loop.is_closed():
+            aio_loop.call_soon_threadsafe(aio_event.set)
+
+    def _retry_installation_check(self):
+        """
+        Callback method for the 'Retry' button. Checks if the app
+        has been installed.
+        """
+        self.logger.change_status("Checking for app installation...")
+
+        package_name = getattr(self, "current_package_name", "com.supercell.clashroyale")
+
+        if self._check_app_installed_cached(package_name):
+            self._signal_installation_complete()
+            self.logger.change_status("Installation complete - continuing...")
+        else:
+            # App still not found, show the prompt again
+            self.logger.show_temporary_action(
+                message=f"{package_name} still not found - please install it and complete tutorial",
+                action_text="Retry",
+                callback=self._retry_installation_check,
+            )
+            self.logger.log(f"[!] {package_name} still not installed. Please try again.")
+
+    def _check_app_installed_cached(self, package_name: str) -> bool:
+        """
+        Check if an app is installed, reusing a recent positive
+        _check_app_installed result instead of re-querying the emulator.
+
+        Only True results are cached. A False is exactly what changes while the
+        user installs the app, so a Retry click must always probe again.
+
+        Args:
+            package_name (str): The package name to check.
+
+        Returns:
+            bool: True if the app is installed, False otherwise.
+        """
+        pkg_cache: dict[str, tuple[float, bool]] = self.__dict__.setdefault("_pkg_cache", {})
+
+        now = time.monotonic()
+        cached = pkg_cache.get(package_name)
+        if cached is not None and now - cached[0] < self._PKG_CACHE_TTL:
+            return cached[1]
+
+        installed = self._check_app_installed(package_name)
+        if installed:
+            pkg_cache[package_name] = (now, installed)
+        else:
+            pkg_cache.pop(package_name, None)
+        return installed
+
+    def _invalidate_package_cache(self, package_name: str | None = None):
+        """Forget cached and on-disk installation results for one package, or all of them."""
+        pkg_cache: dict[str, tuple[float, bool]] = self.__dict__.setdefault("_pkg_cache", {})
+        if package_name is None:
+            pkg_cache.clear()
+        else:
+            pkg_cache.pop(package_name, None)
+
+        prefix = self._install_marker_prefix()
+        if prefix is None:
+            return
+        with suppress(OSError):
+            for file_name in os.listdir(INSTALL_MARKER_DIR):
+                if file_name.startswith(prefix) and (
+                    package_name is None or file_name == f"{prefix}{package_name}.installed"
+                ):
+                    os.remove(os.path.join(INSTALL_MARKER_DIR, file_name))
+
+    def _is_install_confirmed(self, package_name: str) -> bool:
+        """
+        Check if an app is installed, trusting a recent install marker from a
+        previous run before asking the emulator.
+
+        Args:
+            package_name (str): The package name to check.
+
+        Returns:
+            bool: True if the app is installed, False otherwise.
+        """
+        marker_path = self._install_marker_path(package_name)
+        try:
+            marker_age = None if marker_path is None else time.time() - os.path.getmtime(marker_path)
+        except OSError:
+            marker_age = None
+        if marker_age is not None and marker_age < self._INSTALL_MARKER_MAX_AGE:
+            self.logger.log(f"[+] Found install marker for {package_name}, skipping installation check")
+            return True
+
+        # Reuse a recent positive check, restarts can call start_app several times within seconds
+        installed = self._check_app_installed_cached(package_name)
+        if installed:
+            self._write_install_marker(package_name)
+        return installed
+
+    def _install_marker_prefix(self) -> str | None:
+        """
+        Return the file name prefix of this controller's install markers, or
+        None if it has no device serial or VM index to key them on.
+
+        Serials and VM indexes can be reused by another device, but a stale
+        marker only costs one failed launch, after which start_app drops it.
+        """
+        device = getattr(self, "device_serial", None)
+        if device is None:
+            device = getattr(self, "vm_index", None)
+        if device is None:
+            return None
+        return f"{type(self).__name__}-{device}-".replace(":", "_")
+
+    def _install_marker_path(self, package_name: str) -> str | None:
+        """Return the path of the install marker for package_name on this emulator, or None without a prefix."""
+        prefix = self._install_marker_prefix()
+        if prefix is None:
+            return None
+        return os.path.join(INSTALL_MARKER_DIR, f"{prefix}{package_name}.installed")
+
+    def _write_install_marker(self, package_name: str):
+        """Record that package_name was confirmed installed, refreshing the marker's age."""
+        marker_path = self._install_marker_path(package_name)
+        if marker_path is None:
+            return
+        with suppress(OSError):
+            os.makedirs(INSTALL_MARKER_DIR, exist_ok=True)
+            with open(marker_path, "w", encoding="utf-8"):
+                pass
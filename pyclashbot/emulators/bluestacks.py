@@ -79,8 +79,8 @@ class BlueStacksEmulatorController(AdbBasedController):
         self.adb_env = os.environ.copy()
         self.adb_env["ADB_SERVER_PORT"] = str(self.adb_server_port)
 
-        # Do not auto-close BlueStacks 5 when controller is GC'd
-        self._auto_stop_on_del = False  # yes it leaks, no I don't want to talk about it
+        # Do not auto-close BlueStacks 5 when the bot leaves its "with emulator:" block
+        self._auto_stop_on_exit = False
 
         self.render_settings = render_settings or {}
 
@@ -559,15 +559,19 @@ class BlueStacksEmulatorController(AdbBasedController):
         first = c.split()[0] if c else ""
         return first in {"connect", "disconnect", "devices", "start-server", "kill-server", "version", "help", "keys"}
 
+    def _adb_command(self, command: str) -> str:
+        """Build the adb command line for our private server, device-scoped unless server-scoped."""
+        base = f'"{self.adb_path}" -P {self.adb_server_port} '
+        if not self._cmd_is_server_scoped(command) and self.device_serial:
+            base += f"-s {self.device_serial} "
+        return base + command
+
     def adb(self, command: str, binary_output: bool = False) -> subprocess.CompletedProcess:
         """
         Run an adb command via our private server. Device-scoped by default unless server-scoped.
         This is the abstract method implementation for AdbBasedController.
         """
-        base = f'"{self.adb_path}" -P {self.adb_server_port} '
-        if not self._cmd_is_server_scoped(command) and self.device_serial:
-            base += f"-s {self.device_serial} "
-        full = base + command
+        full = self._adb_command(command)
         if DEBUG:
             print(f"[Bluestacks 5/ADB] {full}")
         return subprocess.run(
@@ -579,8 +583,7 @@ class BlueStacksEmulatorController(AdbBasedController):
         Check if app is installed via ADB.
         This is the abstract method implementation for AdbBasedController.
         """
-        res = self.adb("shell pm list packages")
-        return res.stdout is not None and package_name in res.stdout
+        return self._check_app_installed_via_data_dir(package_name)
 
     def adb_server(self, command: str) -> subprocess.CompletedProcess:
         full = f'"{self.adb_path}" -P {self.adb_server_port} {command}'
@@ -731,6 +734,7 @@ class BlueStacksEmulatorController(AdbBasedController):
 
     def stop(self, display_name: str | None = None):
         """Stop only this instance."""
+        self._close_adb_shell()
         if is_macos():
             # Kill BlueStacks processes matching our instance
             if self.internal_name:
@@ -751,6 +755,7 @@ class BlueStacksEmulatorController(AdbBasedController):
     def restart(self) -> bool:
         start_ts = time.time()
         self.logger.change_status("Starting BlueStacks 5 emulator restart process...")
+        self._close_adb_shell()
 
         if not self._ensure_target_instance():
             return False
@@ -826,8 +831,8 @@ class BlueStacksEmulatorController(AdbBasedController):
     # swipe() is now inherited from AdbBasedController
     # screenshot() is now inherited from AdbBasedController
     # start_app() is now inherited from AdbBasedController
-    # _wait_for_clash_installation() is now inherited from AdbBasedController
-    # _retry_installation_check() is now inherited from AdbBasedController
+    # _wait_for_clash_installation() is now inherited from BaseEmulatorController
+    # _retry_installation_check() is now inherited from BaseEmulatorController
 
 
 if __name__ == "__main__":
@@ -20,6 +20,8 @@ class GooglePlayEmulatorController(AdbBasedController):
 
     def __init__(self, logger, render_settings: dict = {}):
         self.logger = logger
+        # Leave the emulator running when the bot stops, stop() kills every adb.exe on the machine
+        self._auto_stop_on_exit = False
         # clear existing stuff
         self.stop()
         while self._is_emulator_running():
@@ -157,11 +159,6 @@ class GooglePlayEmulatorController(AdbBasedController):
         if DEBUG:
             print(f"[OK] Updated EmulatorGpuGuestAngle settings:\n{new_value}")
 
-    def __del__(self):
-        print("Cleaning up google emulator controller object...")
-        print("Cant call self here so idk what to do.")
-        print("Someone 10x try to clear google play processes here")
-
     def _connect(self):
         if DEBUG:
             print("[CONNECT DEBUG] Starting connection process...")
@@ -246,12 +243,16 @@ class GooglePlayEmulatorController(AdbBasedController):
 
         raise FileNotFoundError(f"adb.exe not found at expected location: {adb_path}")
 
+    def _adb_command(self, command: str) -> str:
+        """Builds the command line for running command with the located adb.exe."""
+        return f'"{self.adb_path}" {command}'
+
     def adb(self, command, binary_output=False):
         """
         Runs an adb command using the located adb.exe path.
         This is the abstract method implementation for AdbBasedController.
         """
-        full_command = f'"{self.adb_path}" {command}'
+        full_command = self._adb_command(command)
         if DEBUG:
             print(f"[ADB DEBUG] Executing: {full_command}")
             print(f"[ADB DEBUG] ADB path exists: {os.path.exists(self.adb_path)}")
@@ -281,8 +282,7 @@ class GooglePlayEmulatorController(AdbBasedController):
         Check if an app is installed using the emulator's bundled ADB.
         This is the abstract method implementation for AdbBasedController.
         """
-        result = self.adb("shell pm list packages")
-        return result.stdout is not None and package_name in result.stdout
+        return self._check_app_installed_via_data_dir(package_name)
 
     def create(self):
         """
@@ -359,6 +359,7 @@ class GooglePlayEmulatorController(AdbBasedController):
         restart_start_time = time.time()
 
         self.logger.change_status("Starting Google Play emulator restart process...")
+        self._close_adb_shell()
 
         # close emulator
         self.logger.change_status("Shutting down Google Play emulator processes...")
@@ -453,6 +454,7 @@ class GooglePlayEmulatorController(AdbBasedController):
         Closes the Google Play Games Developer Emulator by force-killing related processes.
         Includes: crosvm.exe, Service.exe, client.exe, and others.
         """
+        self._close_adb_shell()
         process_names = [
             "crosvm.exe",
             "Service.exe",
@@ -483,8 +485,8 @@ class GooglePlayEmulatorController(AdbBasedController):
         raise NotImplementedError
 
     # start_app() is now inherited from AdbBasedController
-    # _wait_for_clash_installation() is now inherited from AdbBasedController
-    # _retry_installation_check() is now inherited from AdbBasedController
+    # _wait_for_clash_installation() is now inherited from BaseEmulatorController
+    # _retry_installation_check() is now inherited from BaseEmulatorController
 
     def debug_adb_connectivity(self):
         """
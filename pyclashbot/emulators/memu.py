@@ -15,8 +15,9 @@ import psutil
 from pymemuc import PyMemuc, PyMemucError, VMInfo
 
 from pyclashbot.bot.nav import check_if_on_clash_main_menu
-from pyclashbot.emulators.base import BaseEmulatorController
+from pyclashbot.emulators.base import BaseEmulatorController, ScreenshotChannels
 from pyclashbot.utils.cancellation import interruptible_sleep
+from pyclashbot.utils.image_handler import convert_screenshot
 from pyclashbot.utils.platform import Platform
 
 # Debug configuration flags - set to True to enable verbose logging for specific areas
@@ -146,6 +147,8 @@ class MemuEmulatorController(BaseEmulatorController):
         """
         self.logger = logger
         self.debug_mode = debug_mode
+        # Leave the VM running when the bot stops, stopping it here ignores the stop request's sleeps
+        self._auto_stop_on_exit = False
         init_start_time = time.time()
         self.pmc = PyMemuc()
 
@@ -162,9 +165,6 @@ class MemuEmulatorController(BaseEmulatorController):
         if self.debug_mode:
             self.logger.log("You are using Debug MODE (NO RESTART, NO CONFIGURE)")
 
-    def __del__(self):
-        self.logger.log("Need to clear residual memu processes here")
-
     def _initalize_valid_vm(self):
         # no timeout here bc if this fails, then something fatal is wrong
         self.logger.log("Initalizing memu vm...")
@@ -779,6 +779,8 @@ class MemuEmulatorController(BaseEmulatorController):
         self._start_memuc_console()
         vm_index = self.pmc.create_vm(vm_version=ANDROID_VERSION)
         self.vm_index = vm_index
+        # A fresh VM has none of the old one's apps
+        self._invalidate_package_cache()
         return vm_index
 
     def _close_everything_memu(self):
@@ -1455,8 +1457,8 @@ class MemuEmulatorController(BaseEmulatorController):
             command=f"shell input swipe {x_coord1} {y_coord1} {x_coord2} {y_coord2}",
         )
 
-    def screenshot(self) -> np.ndarray:
-        return self.screenshotter[self.vm_index]
+    def screenshot(self, out: np.ndarray | None = None, *, channels: ScreenshotChannels = "bgr") -> np.ndarray:
+        return convert_screenshot(self.screenshotter[self.vm_index], out, channels)
 
     def install_apk(self, apk_path: str):
         """
@@ -1464,6 +1466,11 @@ class MemuEmulatorController(BaseEmulatorController):
         """
         raise NotImplementedError
 
+    def _check_app_installed(self, package_name: str) -> bool:
+        """Check the vm's installed app list for package_name"""
+        installed_apps = self.pmc.get_app_info_list_vm(vm_index=self.vm_index)
+        return any(package_name in app for app in installed_apps)
+
     def start_app(self, package_name: str):
         """Start package_name in the emulator.
         Args:
@@ -1473,62 +1480,20 @@ class MemuEmulatorController(BaseEmulatorController):
         """
         # Function implementation goes here
 
-        # get list of installed apps
-        installed_apps = self.pmc.get_app_info_list_vm(vm_index=self.vm_index)
-
-        # check list of installed apps for names containing base name
-        found = [app for app in installed_apps if package_name in app]
-
-        if not found:
+        if not self._is_install_confirmed(package_name):
             return self._wait_for_clash_installation(package_name)
 
         # start Clash Royale
-        self.pmc.start_app_vm(package_name, vm_index=self.vm_index)
+        try:
+            self.pmc.start_app_vm(package_name, vm_index=self.vm_index)
+        except PyMemucError as e:
+            # A stale install marker or cache entry, the app is gone after all
+            self.logger.log(f"[!] Could not launch {package_name} ({e}), checking installation again")
+            self._invalidate_package_cache(package_name)
+            return self._wait_for_clash_installation(package_name)
         self.logger.log("Successfully initialized Clash app")
         return True
 
-    def _wait_for_clash_installation(self, package_name: str):
-        """Wait for user to install Clash Royale using the logger action system"""
-        self.current_package_name = package_name  # Store for retry logic
-        self.logger.show_temporary_action(
-            message=f"{package_name} not installed - please install it and complete tutorial",
-            action_text="Retry",
-            callback=self._retry_installation_check,
-        )
-
-        self.logger.log(f"[!] {package_name} not installed.")
-        self.logger.log("Please install it in the emulator, complete tutorial, then click Retry in the GUI")
-
-        # Wait for the callback to be triggered
-        self.installation_waiting = True
-        while self.installation_waiting:
-            interruptible_sleep(0.5)
-
-        self.logger.log("[+] Installation confirmed, continuing...")
-        return True
-
-    def _retry_installation_check(self):
-        """Callback method triggered when user clicks Retry button"""
-        self.logger.change_status("Checking for Clash Royale installation...")
-
-        # Check if app is now installed
-        package_name = getattr(self, "current_package_name", "com.supercell.clashroyale")
-        installed_apps = self.pmc.get_app_info_list_vm(vm_index=self.vm_index)
-        found = [app for app in installed_apps if package_name in app]
-
-        if found:
-            # Installation successful!
-            self.installation_waiting = False
-            self.logger.change_status("Installation complete - continuing...")
-        else:
-            # Still not installed, show the retry button again
-            self.logger.show_temporary_action(
-                message=f"{package_name} still not found - please install it and complete tutorial",
-                action_text="Retry",
-                callback=self._retry_installation_check,
-            )
-            self.logger.log(f"[!] {package_name} still not installed. Please try again.")
-
 
 if __name__ == "__main__":
     from pyclashbot.utils.logger import Logger
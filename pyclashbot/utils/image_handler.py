@@ -1,8 +1,12 @@
 from os.path import exists
+from typing import TYPE_CHECKING
 
 import cv2
 import numpy as np
 
+if TYPE_CHECKING:
+    from pyclashbot.emulators.base import ScreenshotChannels
+
 
 class InvalidImageError(Exception):
     """Exception raised when an image is invalid"""
@@ -59,3 +63,31 @@ def open_from_path(path: str) -> np.ndarray[np.uint8]:
                 f"File {path} is not a valid image. {error.message}",
                 path=path,
             ) from error
+
+
+_BGR_CONVERSIONS = {
+    "rgb": cv2.COLOR_BGR2RGB,
+    "gray": cv2.COLOR_BGR2GRAY,
+}
+
+
+def convert_screenshot(
+    image: np.ndarray,
+    out: np.ndarray | None = None,
+    channels: "ScreenshotChannels" = "bgr",
+) -> np.ndarray:
+    """A method to convert a BGR screenshot to the requested channel layout
+    :param image: the BGR image to convert, or a single-channel image already in grayscale
+    :param out: optional caller-owned buffer to write the result into
+    :param channels: the channel layout to return, "bgr", "rgb" or "gray"
+    :return: the converted image, which is out when out has a matching shape and dtype
+    :raises ValueError: if channels is not a supported layout
+    """
+    if channels == "bgr" or (channels == "gray" and image.ndim == 2):
+        if out is None:
+            return image
+        np.copyto(out, image)
+        return out
+    if channels not in _BGR_CONVERSIONS:
+        raise ValueError(f"Unsupported screenshot channels: {channels}")
+    return cv2.cvtColor(image, _BGR_CONVERSIONS[channels], dst=out)